@@ -3,23 +3,42 @@ from __future__ import annotations
 
 import json
 import os
+import re
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
 
 try:
     import yaml  # type: ignore
+
+    # Prefer the libyaml bindings, fall back to the pure Python implementation
+    try:
+        from yaml import CSafeDumper as YamlDumper  # type: ignore
+        from yaml import CSafeLoader as YamlLoader  # type: ignore
+    except ImportError:
+        from yaml import SafeDumper as YamlDumper  # type: ignore
+        from yaml import SafeLoader as YamlLoader  # type: ignore
 except ImportError:
     yaml = None
 
 from enum import Enum
-from typing import TYPE_CHECKING, Callable, Tuple
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Tuple
 
 from yt_dlp.postprocessor.common import PostProcessor  # type: ignore
-from yt_dlp.utils import PostProcessingError, traverse_obj  # type: ignore
+from yt_dlp.utils import traverse_obj  # type: ignore
 
 if TYPE_CHECKING:
     import yt_dlp.YoutubeDL as YTDL  # type: ignore
 
 # NOTE: Currently only supports "channel" field
 MAPPING_FIELD_PATTERN = r"%\((mapped_\w+)\)s"
+MAPPING_FIELD_RE = re.compile(MAPPING_FIELD_PATTERN)
+# NOTE: Processing at any other positions are more complicated and not necessary for the current use case
+SUPPORTED_PP_POSITIONS = ("pre_process", "after_filter", "video")
+_SUPPORTED_PP_POSITIONS_SET = frozenset(SUPPORTED_PP_POSITIONS)
 MAPPING_CONFIG_TEMPLATE = {
     "uncategorized": {
         "field": {
@@ -56,6 +75,8 @@ class ChannelMappingPP(PostProcessor):
     Attributes:
         _kwargs (dict): Additional keyword arguments for this post-processor.
         _mapping (dict): Dictionary containing the channel name mappings.
+        _index (dict): Inverted index of `_mapping`, maps the original field value to its category data,
+            field name, and new field value.
         _downloader (yt_dlp.YoutubeDL): The downloader instance to be used by the post-processor.
 
     Methods:
@@ -71,6 +92,8 @@ class ChannelMappingPP(PostProcessor):
             Checks the file type of the configuration file.
         load_mapping(config_path: str) -> dict:
             Loads the mapping file. If the file does not exist, creates a template mapping file.
+        build_index(mapping: dict) -> dict:
+            Builds an inverted index of the mapping for constant time lookups.
         is_mapping_used():
             Checks if the variable in the mapping template is used in the mapping file.
         mapping_before_download(information: dict) -> Tuple[list, dict]:
@@ -82,13 +105,14 @@ class ChannelMappingPP(PostProcessor):
         check_pp_position():
             Checks the position of the post-processor in the list of postprocessors and validates its execution position.
         run(information: dict) -> Tuple[list, dict]:
-            Executes the post-processor, checks its position, and performs the main processing.
+            Executes the post-processor and performs the main processing if its position is supported.
     """
 
     # _WORKING = True
     # Valid URL pattern for youtube video, live stream, shorts, and shortened URL.
     # _VALID_URL = r"https?:\/\/(?:www\.)?youtu(?:be\.com\/(?:watch\?v=|live\/|shorts\/)|.be\/)[\w-]+"
     _downloader: YTDL = None
+    _NAME: str  # Set after the class body
 
     def __init__(self, downloader=None, **kwargs):
         """
@@ -101,6 +125,8 @@ class ChannelMappingPP(PostProcessor):
         Attributes:
             _kwargs (dict): Dictionary of additional keyword arguments.
             _mapping (dict): Dictionary containing the loaded mapping data.
+            _index (dict): Inverted index of the loaded mapping data.
+            _position_ok (bool): Whether the post-processor runs at a supported position, checked on the first run.
         """
         super().__init__(downloader)
         self._kwargs: dict = kwargs
@@ -109,7 +135,22 @@ class ChannelMappingPP(PostProcessor):
         _mapping_path: str = self._kwargs.get("config", "")
         _mapping_path = self._normalize_path(_mapping_path)
         self._mapping: dict = self.load_mapping(_mapping_path)
-        self.mapped_fields: list = []
+        self._index: Dict[str, Tuple[dict, str, str]] = self.build_index(self._mapping)
+        # The mapping is static once loaded, bind the lookup once
+        self._lookup: Callable = self._index.get
+        self.mapped_fields: set = set()
+        self._cleanup_pp: PostProcessor = None
+
+        # Configured directory -> resolved (and created) directory
+        self._resolved_paths: Dict[str, str] = {}
+
+        # The downloader can be set after construction, these are resolved on the first run
+        self._position_ok: bool = None
+        self._verbose: bool = False
+
+        # Cached result of `is_mapping_used`, tied to the downloader params it was computed from
+        self._mapping_used: bool = False
+        self._mapping_used_params: dict = None
 
     def _normalize_path(self, path: str) -> str:
         """
@@ -149,11 +190,17 @@ class ChannelMappingPP(PostProcessor):
             file_path (str): The path to the file.
             file_type (ConfigTypeEnum): The file type of the file.
         """
+        # orjson only works with bytes and supports a 2-space indentation
+        if file_type == ConfigTypeEnum.JSON and orjson is not None:
+            with open(file_path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            return
+
         save_func: Callable = None
         if file_type == ConfigTypeEnum.JSON:
             save_func = json.dump
         elif file_type == ConfigTypeEnum.YAML:
-            save_func = yaml.dump
+            save_func = partial(yaml.dump, Dumper=YamlDumper, allow_unicode=True)
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
 
@@ -171,11 +218,15 @@ class ChannelMappingPP(PostProcessor):
         Returns:
             dict: The loaded file as a dictionary.
         """
+        if file_type == ConfigTypeEnum.JSON and orjson is not None:
+            with open(file_path, "rb") as f:
+                return orjson.loads(f.read())
+
         load_func: Callable = None
         if file_type == ConfigTypeEnum.JSON:
             load_func = json.load
         elif file_type == ConfigTypeEnum.YAML:
-            load_func = yaml.safe_load
+            load_func = partial(yaml.load, Loader=YamlLoader)
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
 
@@ -235,33 +286,60 @@ class ChannelMappingPP(PostProcessor):
         mapping: dict = self._load_file(config_path, self.check_config_type(config_path))
         return mapping
 
-    def is_mapping_used(self) -> list:
+    def build_index(self, mapping: dict) -> Dict[str, Tuple[dict, str, str]]:
         """
-        Check if the variable in the mapping template is used in the mapping file.
+        Build an inverted index of the mapping, so a lookup does not need to scan every category and field.
+
+        Args:
+            mapping (dict): The loaded mapping data.
 
         Returns:
-            list: A list of the mapped fields found in the file template.
-        """
-        # The template should be like "%(mapped_channel)s"
-        file_template = traverse_obj(self._downloader.params, ["outtmpl", "default"], default="")
-        return "%(mapped_channel)s" in file_template
+            Dict[str, Tuple[dict, str, str]]: The original field value mapped to its category data,
+                the matched field name, and the new field value.
 
-    def find_field(self, original_channel: str, category_dict: dict) -> Tuple[str, str]:
+        Raises:
+            ValueError: If a category directory ("home" or "temp") is not a string.
+        """
+        index: Dict[str, Tuple[dict, str, str]] = {}
+        # Empty nodes (e.g. an empty file or `channel:` without entries) are loaded as None, skip them
+        categories = mapping.items() if isinstance(mapping, dict) else ()
+        for category, category_data in categories:
+            if not isinstance(category_data, dict):
+                continue
+            for dir_type in ("home", "temp"):
+                location = category_data.get(dir_type)
+                if location and not isinstance(location, str):
+                    raise ValueError(
+                        f'Invalid "{dir_type}" value {location!r} for category "{category}" in the mapping file'
+                        " (should be a path)"
+                    )
+            fields: dict = category_data.get("field") or {}
+            if not isinstance(fields, dict):
+                continue
+            for field, field_data in fields.items():
+                if not isinstance(field_data, dict):
+                    continue
+                for original_value, new_value in field_data.items():
+                    # Keep the first mapping found in case of duplicates
+                    if new_value and original_value not in index:
+                        index[original_value] = (category_data, field, new_value)
+        return index
+
+    def is_mapping_used(self) -> bool:
         """
-        Find the mapped field name based on the original channel name.
-
-        Args:
-            original_channel (str): The original channel name.
-            category_dict (str): The category name.
+        Check if the variable in the mapping template is used in the mapping file.
+        The result is cached until the downloader params are replaced.
 
         Returns:
-            Tuple[str, str]: The matched field name and the new field name.
+            bool: Whether the mapped channel field is found in the file template.
         """
-        for field, field_data in category_dict.get("field", {}).items():
-            new_field_name: str = field_data.get(original_channel, "")
-            if new_field_name:
-                return field, new_field_name
-        return "", ""
+        params: dict = self._downloader.params
+        if params is not self._mapping_used_params:
+            # The template should be like "%(mapped_channel)s"
+            file_template = traverse_obj(params, ["outtmpl", "default"], default="")
+            self._mapping_used = "mapped_channel" in MAPPING_FIELD_RE.findall(file_template)
+            self._mapping_used_params = params
+        return self._mapping_used
 
     def find_category(self, original_channel: str, default: str = "") -> Tuple[dict, str, str]:
         """
@@ -269,20 +347,20 @@ class ChannelMappingPP(PostProcessor):
 
         Args:
             original_channel (str): The original channel name.
+            default (str): The new field name returned when the channel is not mapped.
 
         Returns:
             Tuple[dict, str, str]: The matched category data, the matched field name, and the new field name.
         """
-        for category, category_data in self._mapping.items():
-            # Find the mapped field name
-            field, new_field_name = self.find_field(original_channel, category_data)
-            if new_field_name:
-                return category_data, field, new_field_name
+        match = self._lookup(original_channel)
+        if match is not None:
+            return match
         return {}, "", default
 
     def change_path(self, category: dict, dir_type: str):
         """
         Change the directory of the downloaded file based on the category and directory type.
+        Each directory is only resolved and created once per instance.
 
         Args:
             category (dict): The category data containing the directory location.
@@ -292,9 +370,12 @@ class ChannelMappingPP(PostProcessor):
         if not new_location:
             return
 
-        new_location: str = os.path.realpath(new_location)
-        os.makedirs(new_location, exist_ok=True)
-        self._downloader.params["paths"][dir_type] = new_location
+        resolved_location: str = self._resolved_paths.get(new_location)
+        if resolved_location is None:
+            resolved_location = os.path.realpath(new_location)
+            os.makedirs(resolved_location, exist_ok=True)
+            self._resolved_paths[new_location] = resolved_location
+        self._downloader.params.setdefault("paths", {})[dir_type] = resolved_location
 
     def mapping_before_download(self, information: dict) -> Tuple[list, dict]:
         """
@@ -318,17 +399,21 @@ class ChannelMappingPP(PostProcessor):
         # Find the mapping
         category, field, new_channel_name = self.find_category(original_channel, default=original_channel)
 
-        # Change the target directory
-        self.change_path(category, "home")  # Target directory
-        self.change_path(category, "temp")  # Temporary download directory
-        self.to_screen(
-            f"Original channel: \033[33m{original_channel}\033[39m -> New channel: \033[32m{new_channel_name}\033[39m"
-        )
+        # Change the target directory, unmapped channels (the common case) have no category
+        if category:
+            self.change_path(category, "home")  # Target directory
+            self.change_path(category, "temp")  # Temporary download directory
+
+        # Unchanged channel names are only reported in verbose mode
+        if self._verbose or new_channel_name != original_channel:
+            self.to_screen(
+                f"Original channel: \033[33m{original_channel}\033[39m -> New channel: \033[32m{new_channel_name}\033[39m"
+            )
         mapped_field_name: str = f"mapped_{field or 'channel'}"
 
         # Add the mapped channel name to the information dictionary
         information.update({mapped_field_name: new_channel_name})
-        self.mapped_fields.append(mapped_field_name)
+        self.mapped_fields.add(mapped_field_name)
         return [], information
 
     def mapping_after_download(self, information: dict) -> Tuple[list, dict]:
@@ -347,7 +432,7 @@ class ChannelMappingPP(PostProcessor):
         """
         # NOTE: Not implemented yet as it is not necessary for the current use case AND might be too complicated
         # NOTE: Need to tidy up yt_dlp's `information` dict first :<
-        _this_class_name = self.__class__.__name__[:-2]
+        _this_class_name = self._NAME
         raise NotImplementedError(
             f'Not implemented yet. Consider set {_this_class_name} at "pre_process" instead '
             '("pre_process", "after_filter" and "video" are tested working) e.g. '
@@ -365,9 +450,8 @@ class ChannelMappingPP(PostProcessor):
 
         Returns:
             Tuple[list, dict]: The result of the processing, which can be a list and a dictionary.
-
-        Raises:
-            PostProcessingError: If the after download mapping is not implemented.
+                The information is returned unchanged after download, as `mapping_after_download`
+                is not implemented.
         """
         # Before download
         if not information.get("filepath", False):
@@ -375,15 +459,8 @@ class ChannelMappingPP(PostProcessor):
 
         # After download
         # REVIEW: Should we implement the after download mapping?
-        _this_class_name = self.__class__.__name__[:-2]
-        try:
-            return self.mapping_after_download(information)
-        except NotImplementedError as exc:
-            raise PostProcessingError(
-                f'Not implemented yet. Consider set {_this_class_name} at "pre_process" instead '
-                '("after_filter" and "video" are tested working) e.g. '
-                f'--use-postprocessor "{_this_class_name}:when=pre_process"'
-            ) from exc
+        # NOTE: Skip instead of calling `mapping_after_download`, which always raises NotImplementedError
+        return [], information
 
     def check_pp_position(self):
         """
@@ -392,30 +469,23 @@ class ChannelMappingPP(PostProcessor):
         This method retrieves the list of postprocessors from the downloader's parameters, locates the current
         post-processor in that list, and checks its execution position. The execution position must be one of
         the valid values: 'pre_process', 'after_filter', or 'video'. If the execution position is invalid, a
-        PostProcessingError is raised.
+        ValueError is raised.
 
         Raises:
-            PostProcessingError: If the execution position is not one of the valid values.
+            ValueError: If the execution position is not one of the valid values.
         """
         # Locate the position of this post-processor in the list
-        pp_list: list = self._downloader.params.get("postprocessors", [])
-        pp_position = -1
-        for i, pp in enumerate(pp_list):
-            if pp.get("key") == self.__class__.__name__[:-2]:
-                pp_position = i
-                break
+        pp_list: list = self.get_param("postprocessors", [])
+        pp_exec_info: dict = next((pp for pp in pp_list if pp.get("key") == self._NAME), {})
 
         # Check the execution position of this post-processor
-        pp_exec_info: dict = pp_list[pp_position] if pp_position >= 0 else {}
         pp_exec_position: str = pp_exec_info.get("when", "post_process")  # Default: post_process
 
         # Validate the execution position
-        # NOTE: Processing at any other positions are more complicated and not necessary for the current use case
-        supported_pp_positions: list = ["pre_process", "after_filter", "video"]
-        if pp_exec_position not in supported_pp_positions:
+        if pp_exec_position not in _SUPPORTED_PP_POSITIONS_SET:
             raise ValueError(
-                f'Invalid "when" value "{pp_exec_position}" for post-processor "{self.__class__.__name__[:-2]}"'
-                f" (should be: {', '.join(supported_pp_positions)})"
+                f'Invalid "when" value "{pp_exec_position}" for post-processor "{self._NAME}"'
+                f" (should be: {', '.join(SUPPORTED_PP_POSITIONS)})"
             )
 
     def run(self, information: dict) -> Tuple[list, dict]:
@@ -430,29 +500,46 @@ class ChannelMappingPP(PostProcessor):
         """
         deletable: list = []
 
-        # Skip if the mapping is not used
-        if not self.is_mapping_used():
+        # The downloader params do not change once it is set up, resolve them only once
+        if self._position_ok is None:
+            self._verbose = bool(self.get_param("verbose", False))
+            self._position_ok = True
+            try:
+                self.check_pp_position()
+            except ValueError as exc:
+                self._position_ok = False
+                self.report_warning(str(exc))
+
+        # Skip if the post-processor position is not supported or the mapping is not used
+        if not self._position_ok or not self.is_mapping_used():
             return deletable, information
 
         # Attempt to process the information
         try:
-            self.check_pp_position()
             deletable, information = self.main_processing(information)
-        except Exception:
-            pass
+        except OSError as exc:  # e.g. the category directory can't be created
+            self.report_warning(f"Failed to apply the channel mapping: {exc}")
         finally:  # Clean up afterwards
-            self._downloader.add_post_processor(_post_cleanup(self.mapped_fields), when="after_video")
+            # Register once, the cleanup post-processor shares `mapped_fields` with this instance
+            if self._cleanup_pp is None:
+                self._cleanup_pp = _post_cleanup(self.mapped_fields)
+                self._downloader.add_post_processor(self._cleanup_pp, when="after_video")
 
         return deletable, information
 
 
+# Post-processor name without the "PP" suffix, as used in `--use-postprocessor`
+ChannelMappingPP._NAME = ChannelMappingPP.__name__[:-2]
+
+
 # Post-processor to remove every added field from ChannelMappingPP in the information dictionary
-def _post_cleanup(keys: list) -> PostProcessor:
+def _post_cleanup(keys: set) -> PostProcessor:
     """
     Remove every added field from ChannelMappingPP in the information dictionary.
 
     Args:
-        keys (list): A list of keys to be removed from the information dictionary.
+        keys (set): The keys to be removed from the information dictionary. The set is read
+            on every run, so keys added after the post-processor is created are removed too.
 
     Returns:
         PostProcessor: A post-processor instance to remove the added fields from the information dictionary.
@@ -473,8 +560,9 @@ def _post_cleanup(keys: list) -> PostProcessor:
             Returns:
                 tuple: A tuple containing an empty list and the processed information dictionary.
             """
-            for key in keys:
-                information.pop(key, None)
+            # Only touch the keys actually present, the intersection is done by the set implementation
+            for key in information.keys() & keys:
+                del information[key]
             return [], information
 
     return PostCleanupPP()